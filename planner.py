@@ -7,17 +7,56 @@ Summary: A daily planner built with curses, SQLite, and python.
 
 import curses
 import sqlite3
+import unicodedata
 from datetime import date, datetime, timedelta
-from dateutil import parser as date_parser
 
 DB_FILE = "todos.db"
 
+# Idle time after which pending changes are committed (also the getch timeout).
+COMMIT_DELAY_MS = 500
+
+# dateutil's parser module, imported on first use by parse_due_date.
+_date_parser = None
+
+# Common due-date shapes tried with strptime before falling back to dateutil.
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%m-%d-%Y")
+
+HEADER = "📋 Daily Planner (Dashboard)"
+HELP = "a=add  d=done  x=delete  c=completed  /=search  f=filter  q=quit"
+COMPLETED_HEADER = "✅ Completed Todos (press b to go back)"
+RULE = "-" * 50
+
+# Todo rows that fit between the list top (row 5) and the stats line (row 18).
+LIST_ROWS = 13
+
+# Colour pair attributes indexed by pair number (0 = none); filled in by main.
+CP = [0] * 5
+
+# Whether the dashboard header (rows 0-2) is currently on screen.
+_header_drawn = False
+# Screen cells available to a todo row after its marker; recomputed on resize.
+_row_width = 0
+# Progress bar width and its empty template; recomputed on resize.
+_bar_width = 0
+_bar_empty = ""
+# (width, filled, percent) of the progress bar on screen, or None.
+_bar_state = None
+
+# Every WHERE fragment the dashboard can apply (none, category filter, search).
+CATEGORY_CLAUSE = "AND category=?"
+SEARCH_CLAUSE = "AND id IN (SELECT rowid FROM todos_fts WHERE todos_fts MATCH ?)"
+WHERE_CLAUSES = ("", CATEGORY_CLAUSE, SEARCH_CLAUSE)
+
 
 # ---------- DB Setup ----------
 def init_db():
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    cur.execute(
+    con = sqlite3.connect(DB_FILE, cached_statements=256)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA temp_store=MEMORY")
+    con.execute("PRAGMA cache_size=-8000")  # 8 MiB page cache
+    con.execute("PRAGMA mmap_size=134217728")  # 128 MiB
+    con.execute(
         """CREATE TABLE IF NOT EXISTS todos (
             id INTEGER PRIMARY KEY,
             title TEXT,
@@ -27,10 +66,68 @@ def init_db():
             deleted INTEGER DEFAULT 0
         )"""
     )
+    # Full-text index over titles for search, kept in sync by triggers.
+    has_fts = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='todos_fts'"
+    ).fetchone()
+    con.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(title, content='todos', content_rowid='id')"
+    )
+    con.execute(
+        """CREATE TRIGGER IF NOT EXISTS todos_ai AFTER INSERT ON todos BEGIN
+            INSERT INTO todos_fts(rowid, title) VALUES (new.id, new.title);
+        END"""
+    )
+    con.execute(
+        """CREATE TRIGGER IF NOT EXISTS todos_ad AFTER DELETE ON todos BEGIN
+            INSERT INTO todos_fts(todos_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END"""
+    )
+    con.execute(
+        """CREATE TRIGGER IF NOT EXISTS todos_au AFTER UPDATE OF title ON todos BEGIN
+            INSERT INTO todos_fts(todos_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO todos_fts(rowid, title) VALUES (new.id, new.title);
+        END"""
+    )
+    if not has_fts:
+        # Index todos that predate the FTS table.
+        con.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+    # Partial indexes for the completed view and the category filter; the
+    # unfiltered dashboard already walks the table in rowid order.
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_done ON todos(id DESC) WHERE deleted=0 AND done=1"
+    )
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_category ON todos(category) WHERE deleted=0"
+    )
     con.commit()
     return con
 
 
+# ---------- Statements ----------
+def _per_clause(sql):
+    return {w: sql.format(where=w) for w in WHERE_CLAUSES}
+
+
+# Fixed SQL text so sqlite3's per-connection cache reuses the prepared statements.
+STMTS = {
+    "insert": "INSERT INTO todos(title, category, due, done, deleted) VALUES (?,?,?,?,0)",
+    "mark_done": "UPDATE todos SET done=1 WHERE id=?",
+    "delete": "UPDATE todos SET deleted=1 WHERE id=?",
+    "list_live": _per_clause(
+        "SELECT id, title, category, due, done FROM todos WHERE deleted=0 {where} ORDER BY id DESC"
+    ),
+    "list_done": "SELECT id, title, category, due FROM todos WHERE deleted=0 AND done=1 ORDER BY id DESC",
+}
+
+
+def run(con, name, params=(), where_clause=""):
+    sql = STMTS[name]
+    if isinstance(sql, dict):
+        sql = sql[where_clause]
+    return con.execute(sql, params)
+
+
 # ---------- Date Parsing ----------
 def parse_due_date(s: str) -> str:
     s = s.strip().lower()
@@ -45,116 +142,213 @@ def parse_due_date(s: str) -> str:
         return (today + timedelta(days=int(s[1:-1]))).isoformat()
     if s.startswith("+") and s.endswith("w") and s[1:-1].isdigit():
         return (today + timedelta(weeks=int(s[1:-1]))).isoformat()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).date().isoformat()
+        except ValueError:
+            continue
+    global _date_parser
+    if _date_parser is None:
+        from dateutil import parser as _date_parser
     try:
-        return date_parser.parse(s).date().isoformat()
-    except:
+        return _date_parser.parse(s).date().isoformat()
+    except (ValueError, OverflowError, TypeError):
         return s
 
 
 # ---------- DB Operations ----------
+def fts_query(text):
+    # Quote the input as one phrase so FTS5 operators in it stay literal;
+    # the trailing * lets the last word match as a prefix.
+    return '"' + text.replace('"', '""') + '"*'
+
+
 def add_todo(con, title, category, due):
-    cur = con.cursor()
-    cur.execute(
-        "INSERT INTO todos(title, category, due, done, deleted) VALUES (?,?,?,?,0)",
-        (title, category, parse_due_date(due), 0),
+    run(con, "insert", (title, category, parse_due_date(due), 0))
+
+
+def bulk_add_todos(con, items):
+    # items: iterable of (title, category, due); one statement, one commit.
+    con.executemany(
+        STMTS["insert"],
+        [(title, category, parse_due_date(due), 0) for title, category, due in items],
     )
     con.commit()
 
 
 def mark_done(con, tid):
-    cur = con.cursor()
-    cur.execute("UPDATE todos SET done=1 WHERE id=?", (tid,))
-    con.commit()
+    run(con, "mark_done", (tid,))
 
 
 def delete_todo(con, tid):
-    cur = con.cursor()
-    cur.execute("UPDATE todos SET deleted=1 WHERE id=?", (tid,))
-    con.commit()
+    run(con, "delete", (tid,))
 
 
-def get_stats(con, where_clause="", params=()):
-    cur = con.cursor()
-    total = cur.execute(
-        f"SELECT COUNT(*) FROM todos WHERE deleted=0 {where_clause}", params
-    ).fetchone()[0]
-    done = cur.execute(
-        f"SELECT COUNT(*) FROM todos WHERE done=1 AND deleted=0 {where_clause}",
-        params,
-    ).fetchone()[0]
-    return total, done
+# ---------- UI Helpers ----------
+def char_width(ch):
+    # Screen cells taken by one character: 0 for combining marks, 2 for
+    # wide (CJK, most emoji), 1 otherwise.
+    if unicodedata.combining(ch):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in "WF" else 1
 
 
-# ---------- UI Helpers ----------
-def draw_progress_bar(win, y, x, percent, width):
-    filled = int((percent / 100) * width)
-    bar = "[" + "#" * filled + "-" * (width - filled) + f"] {percent}%"
-    win.addstr(y, x, bar)
+def text_width(text):
+    return sum(char_width(ch) for ch in text)
 
 
-def draw_dashboard(stdscr, con, cursor_idx, where_clause="", params=(), subtitle=""):
+def clip(text, width):
+    # Cut text so it fits in at most width screen cells.
+    used = 0
+    for i, ch in enumerate(text):
+        used += char_width(ch)
+        if used > width:
+            return text[:i]
+    return text
+
+
+def clear_screen(stdscr):
+    global _header_drawn, _bar_state
     stdscr.clear()
-    stdscr.addstr(0, 0, "📋 Daily Planner (Dashboard)")
-    stdscr.addstr(1, 0, "a=add  d=done  x=delete  c=completed  /=search  f=filter  q=quit")
-    stdscr.addstr(2, 0, "-" * 50)
+    _header_drawn = False
+    _bar_state = None
+
+
+def prompt(stdscr, y, label):
+    # getstr would return early under the main loop's getch timeout.
+    stdscr.timeout(-1)
+    curses.echo()
+    stdscr.addstr(y, 0, label)
+    text = stdscr.getstr().decode("utf-8")
+    curses.noecho()
+    stdscr.timeout(COMMIT_DELAY_MS)
+    return text
+
+
+def update_widths(stdscr):
+    global _row_width, _bar_width, _bar_empty
+    cols = stdscr.getmaxyx()[1]
+    _row_width = cols - 3
+    _bar_width = cols - 7
+    _bar_empty = "[" + "-" * _bar_width + "]"
+
+
+def draw_progress_bar(win, y, x, percent):
+    # Only the cells between the old and new fill level are rewritten.
+    global _bar_state
+    width = _bar_width
+    filled = int((percent / 100) * width)
+    if _bar_state is None or _bar_state[0] != width:
+        win.addstr(y, x, _bar_empty)
+        last_filled, last_percent = 0, None
+    else:
+        _, last_filled, last_percent = _bar_state
+    if filled > last_filled:
+        win.addstr(y, x + 1 + last_filled, "#" * (filled - last_filled))
+    elif filled < last_filled:
+        win.addstr(y, x + 1 + filled, "-" * (last_filled - filled))
+    if percent != last_percent:
+        win.addstr(y, x + width + 2, f" {percent}%")
+        win.clrtoeol()
+    _bar_state = (width, filled, percent)
+
+
+def draw_stats(stdscr, total, done):
+    progress = int((done / total) * 100) if total else 0
+    stdscr.addstr(18, 0, f"Total: {total}  Done: {done}  Progress: {progress}%")
+    stdscr.clrtoeol()
+    draw_progress_bar(stdscr, 19, 0, progress)
+
+
+def due_color(due_str, today_iso):
+    # Due dates are stored as ISO strings, so string order is date order.
+    # Anything else (unparsed free text) stays uncoloured.
+    if len(due_str) != 10 or due_str[4] != "-" or due_str[7] != "-":
+        return 0
+    if due_str < today_iso:
+        return 1
+    if due_str == today_iso:
+        return 2
+    return 3
+
+
+def format_row(row, today_iso, width):
+    # Extend a todo row with its colour pair, its text clipped to width
+    # screen cells, and the screen column and cell count of the visible
+    # part of its #tag, so redraws do no formatting.
+    tid, title, cat, due_str, done = row
+    head = f"{'[x] ' if done else '[ ] '}{title} "
+    tag = f"#{cat}" if cat else ""
+    due = f" (due {due_str})" if due_str else ""
+    pair = due_color(due_str or "", today_iso)
+    line = clip(head + tag + due, width)
+    tag_cells = text_width(line[len(head) : len(head) + len(tag)])
+    return row + (pair, line, 3 + text_width(head), tag_cells)
+
+
+def fetch_dashboard(con, width, where_clause="", params=()):
+    # One pass over the live rows yields both the active list and the stats.
+    # width is the number of screen cells a row may use after its marker.
+    rows = run(con, "list_live", params, where_clause).fetchall()
+    today_iso = date.today().isoformat()
+    todos = [format_row(r, today_iso, width) for r in rows if not r[4]]
+    total = len(rows)
+    return todos, total, total - len(todos)
+
+
+def draw_dashboard(stdscr, todos, total, done_count, cursor_idx, view_top, subtitle=""):
+    global _header_drawn
+    if _header_drawn:
+        # The header and progress bar are still up; only wipe the subtitle
+        # and list rows, and everything from the prompt row down (a long
+        # prompt answer wraps past row 21).
+        for y in range(3, 18):
+            stdscr.move(y, 0)
+            stdscr.clrtoeol()
+        stdscr.move(21, 0)
+        stdscr.clrtobot()
+    else:
+        clear_screen(stdscr)
+        stdscr.addstr(0, 0, HEADER)
+        stdscr.addstr(1, 0, HELP)
+        stdscr.addstr(2, 0, RULE)
+        _header_drawn = True
 
     if subtitle:
         stdscr.addstr(3, 0, subtitle, curses.A_BOLD)
 
-    cur = con.cursor()
-    cur.execute(
-        f"SELECT id, title, category, due, done FROM todos WHERE deleted=0 AND done=0 {where_clause} ORDER BY id DESC",
-        params,
-    )
-    todos = cur.fetchall()
-
     if not todos:
         stdscr.addstr(5, 0, "No todos yet!", curses.A_DIM)
     else:
-        for idx, t in enumerate(todos):
-            tid, title, cat, due_str, done = t
-            prefix = "[x] " if done else "[ ] "
-
-            attr = 0
-            if due_str and not done:
-                try:
-                    d = datetime.strptime(due_str, "%Y-%m-%d").date()
-                    if d < date.today():
-                        attr = curses.color_pair(1)
-                    elif d == date.today():
-                        attr = curses.color_pair(2)
-                    else:
-                        attr = curses.color_pair(3)
-                except:
-                    pass
+        # Only the rows inside the viewport are drawn.
+        visible = todos[view_top : view_top + LIST_ROWS]
+        for row, t in enumerate(visible):
+            pair, line, tag_col, tag_cells = t[5:]
+            marker = "-> " if view_top + row == cursor_idx else "   "
+            # One write for the row, then recolour the visible tag in place.
+            stdscr.addstr(5 + row, 0, marker)
+            stdscr.addstr(line, CP[pair])
+            if tag_cells:
+                stdscr.chgat(5 + row, tag_col, tag_cells, CP[4])
+
+    draw_stats(stdscr, total, done_count)
 
-            marker = "-> " if idx == cursor_idx else "   "
-            stdscr.addstr(5 + idx, 0, marker)
-            stdscr.addstr(f"{prefix}{title} ", attr)
-            if cat:
-                stdscr.addstr(f"#{cat}", curses.color_pair(4))
-            if due_str:
-                stdscr.addstr(f" (due {due_str})", attr)
+    stdscr.refresh()
 
-    total, done = get_stats(con, where_clause, params)
-    progress = int((done / total) * 100) if total else 0
-    stdscr.addstr(18, 0, f"Total: {total}  Done: {done}  Progress: {progress}%")
-    draw_progress_bar(stdscr, 19, 0, progress, stdscr.getmaxyx()[1] - 7)
 
+def move_cursor(stdscr, old_row, new_row):
+    # Only the two "->" markers change, so rewrite just those cells.
+    stdscr.addstr(5 + old_row, 0, "   ")
+    stdscr.addstr(5 + new_row, 0, "-> ")
     stdscr.refresh()
-    return todos
 
 
 def draw_completed(stdscr, con):
-    stdscr.clear()
-    stdscr.addstr(0, 0, "✅ Completed Todos (press b to go back)")
-    stdscr.addstr(1, 0, "-" * 50)
+    clear_screen(stdscr)
+    stdscr.addstr(0, 0, COMPLETED_HEADER)
+    stdscr.addstr(1, 0, RULE)
 
-    cur = con.cursor()
-    cur.execute(
-        "SELECT id, title, category, due FROM todos WHERE deleted=0 AND done=1 ORDER BY id DESC"
-    )
-    todos = cur.fetchall()
+    todos = run(con, "list_done").fetchall()
 
     if not todos:
         stdscr.addstr(3, 0, "No completed todos yet!", curses.A_DIM)
@@ -163,7 +357,7 @@ def draw_completed(stdscr, con):
             tid, title, cat, due_str = t
             stdscr.addstr(3 + idx, 0, f"[x] {title} ")
             if cat:
-                stdscr.addstr(f"#{cat}", curses.color_pair(4))
+                stdscr.addstr(f"#{cat}", CP[4])
             if due_str:
                 stdscr.addstr(f" (due {due_str})")
 
@@ -178,76 +372,113 @@ def main(stdscr):
     curses.init_pair(2, curses.COLOR_YELLOW, curses.COLOR_BLACK)  # today
     curses.init_pair(3, curses.COLOR_GREEN, curses.COLOR_BLACK)  # future
     curses.init_pair(4, curses.COLOR_CYAN, curses.COLOR_BLACK)  # category
+    CP[1:] = [curses.color_pair(n) for n in range(1, 5)]
+    update_widths(stdscr)
 
     view = "dashboard"
     cursor_idx = 0
+    view_top = 0  # index of the first todo shown
     where_clause = ""
     params = ()
     subtitle = ""
+    todos, total, done_count = [], 0, 0
+    stale = True  # cached todos must be re-read from the DB
+    dirty = True  # screen must be redrawn
+    pending = False  # uncommitted changes
+    stdscr.timeout(COMMIT_DELAY_MS)
 
     while True:
-        todos = []
-
-        if view == "dashboard":
-            todos = draw_dashboard(stdscr, con, cursor_idx, where_clause, params, subtitle)
-        elif view == "completed":
-            draw_completed(stdscr, con)
+        if dirty:
+            if view == "dashboard":
+                if stale:
+                    todos, total, done_count = fetch_dashboard(
+                        con, _row_width, where_clause, params
+                    )
+                    stale = False
+                draw_dashboard(
+                    stdscr, todos, total, done_count, cursor_idx, view_top, subtitle
+                )
+            elif view == "completed":
+                draw_completed(stdscr, con)
+            dirty = False
 
         ch = stdscr.getch()
 
+        # Commit once the user goes idle, switches view, or quits rather
+        # than on every change.
+        if pending and ch in (curses.ERR, ord("q"), ord("c"), ord("b")):
+            con.commit()
+            pending = False
+
         if ch == ord("q"):
             break
+        elif ch == curses.KEY_RESIZE:
+            update_widths(stdscr)
+            clear_screen(stdscr)
+            # Cached rows were clipped to the old width; re-fetch them.
+            dirty = stale = True
         elif view == "dashboard":
-            if ch == curses.KEY_UP and todos:
-                cursor_idx = (cursor_idx - 1) % len(todos)
-            elif ch == curses.KEY_DOWN and todos:
-                cursor_idx = (cursor_idx + 1) % len(todos)
+            if ch in (curses.KEY_UP, curses.KEY_DOWN) and todos:
+                step = -1 if ch == curses.KEY_UP else 1
+                new_idx = (cursor_idx + step) % len(todos)
+                if view_top <= new_idx < view_top + LIST_ROWS:
+                    move_cursor(stdscr, cursor_idx - view_top, new_idx - view_top)
+                else:
+                    # Moved past an edge of the viewport: scroll and repaint.
+                    if new_idx < view_top:
+                        view_top = new_idx
+                    else:
+                        view_top = new_idx - LIST_ROWS + 1
+                    dirty = True
+                cursor_idx = new_idx
             elif ch == ord("a"):
-                curses.echo()
-                stdscr.clear()
-                stdscr.addstr(0, 0, "Title: ")
-                title = stdscr.getstr().decode("utf-8")
-                stdscr.addstr(1, 0, "Category: ")
-                category = stdscr.getstr().decode("utf-8")
-                stdscr.addstr(2, 0, "Due (YYYY-MM-DD, today, tomorrow, +3d): ")
-                due = stdscr.getstr().decode("utf-8")
-                curses.noecho()
+                clear_screen(stdscr)
+                title = prompt(stdscr, 0, "Title: ")
+                category = prompt(stdscr, 1, "Category: ")
+                due = prompt(stdscr, 2, "Due (YYYY-MM-DD, today, tomorrow, +3d): ")
                 add_todo(con, title, category, due)
-                cursor_idx = 0
+                pending = True
+                cursor_idx = view_top = 0
                 where_clause, params, subtitle = "", (), ""
+                dirty = stale = True
             elif ch == ord("d") and todos:
                 mark_done(con, todos[cursor_idx][0])
-                cursor_idx = 0
+                pending = True
+                cursor_idx = view_top = 0
+                dirty = stale = True
             elif ch == ord("x") and todos:
                 delete_todo(con, todos[cursor_idx][0])
-                cursor_idx = 0
+                pending = True
+                cursor_idx = view_top = 0
+                dirty = stale = True
             elif ch == ord("c"):
                 view = "completed"
+                dirty = True
             elif ch == ord("f"):  # filter by category
-                curses.echo()
-                stdscr.addstr(21, 0, "Filter by category (#tag): ")
-                cat = stdscr.getstr().decode("utf-8")
-                curses.noecho()
+                cat = prompt(stdscr, 21, "Filter by category (#tag): ")
                 if cat:
-                    where_clause, params = "AND category=?", (cat,)
+                    where_clause, params = CATEGORY_CLAUSE, (cat,)
                     subtitle = f"Filtered by #{cat}"
-                    cursor_idx = 0
+                    cursor_idx = view_top = 0
+                    stale = True
+                dirty = True  # clear the prompt even if it was cancelled
             elif ch == ord("/"):  # search by keyword
-                curses.echo()
-                stdscr.addstr(21, 0, "Search title: ")
-                query = stdscr.getstr().decode("utf-8")
-                curses.noecho()
+                query = prompt(stdscr, 21, "Search title: ")
                 if query:
-                    where_clause, params = "AND title LIKE ?", (f"%{query}%",)
+                    where_clause, params = SEARCH_CLAUSE, (fts_query(query),)
                     subtitle = f"Search results for '{query}'"
-                    cursor_idx = 0
+                    cursor_idx = view_top = 0
+                    stale = True
+                dirty = True
             elif ch == ord("b"):  # back to full list
                 where_clause, params, subtitle = "", (), ""
-                cursor_idx = 0
+                cursor_idx = view_top = 0
+                dirty = stale = True
         elif view == "completed":
             if ch == ord("b"):
                 view = "dashboard"
-                cursor_idx = 0
+                cursor_idx = view_top = 0
+                dirty = True
 
 
 if __name__ == "__main__":